@@ -8,6 +8,7 @@ from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from db import get_session
 from models import User
+from cache import TTLCache
 
 load_dotenv()
 
@@ -19,6 +20,13 @@ if not NEON_AUTH_JWKS_URL:
 jwks_client = PyJWKClient(NEON_AUTH_JWKS_URL, cache_keys=True, lifespan=3600)
 security = HTTPBearer()
 
+# Token subject -> User field dict, so authenticated requests skip the user
+# SELECT. Plain values rather than the ORM instance: that one belongs to the
+# request's session and is expired by a rollback. Each hit builds a fresh,
+# unattached User. Kept short so role changes made in Neon Auth apply within
+# a minute.
+user_cache = TTLCache(ttl_seconds=60, maxsize=10_000)
+
 def verify_token(token: str):
     try:
         unverified_header = jwt.get_unverified_header(token)
@@ -59,11 +67,16 @@ async def get_db_user(
     except ValueError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: sub is not a valid UUID")
     
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return User(**cached)
+
     result = await session.execute(select(User).where(User.id == valid_uuid))
     user = result.scalars().first()
     
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found in database")
+    user_cache.set(user_id, user.model_dump())
     return user
 
 async def admin_only(user: User = Depends(get_db_user)):
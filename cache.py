@@ -1,31 +1,129 @@
 """Lightweight in-memory TTL cache — no Redis needed.
 
 Used for rarely-changing data (categories, subcategories, brands) to
-skip DB round-trips on every public page load.
+skip DB round-trips on every public page load. Public endpoints cache the
+already-serialized JSON body, so a hit skips ORM hydration and encoding too.
 """
 
+import hashlib
+import logging
 import time
-from typing import Any
+from typing import Any, Awaitable, Callable
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
 
 
 class TTLCache:
-    def __init__(self, ttl_seconds: int = 300):
+    def __init__(self, ttl_seconds: int = 300, maxsize: int | None = None):
         self._ttl = ttl_seconds
+        self._maxsize = maxsize
+        # key -> (expires_at, value); expired entries are kept for get_stale()
         self._store: dict[str, tuple[float, Any]] = {}
 
     def get(self, key: str) -> Any | None:
-        if key in self._store:
-            ts, value = self._store[key]
-            if time.monotonic() - ts < self._ttl:
-                return value
-            del self._store[key]
+        entry = self._store.get(key)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
         return None
 
-    def set(self, key: str, value: Any):
-        self._store[key] = (time.monotonic(), value)
+    def get_stale(self, key: str) -> Any | None:
+        """Last value stored for `key`, expired or not (None once invalidated)."""
+        entry = self._store.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: int | None = None):
+        self._store.pop(key, None)
+        if self._maxsize is not None and len(self._store) >= self._maxsize:
+            # Insertion order == age, so the first key is the oldest entry
+            del self._store[next(iter(self._store))]
+        ttl = self._ttl if ttl_seconds is None else ttl_seconds
+        self._store[key] = (time.monotonic() + ttl, value)
 
     def invalidate(self, key: str):
         self._store.pop(key, None)
 
+    def clear(self):
+        self._store.clear()
+
+
+# 5-minute default TTL; bounded because some keys embed client-supplied ids
+cache = TTLCache(ttl_seconds=300, maxsize=1024)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _serialize(data: Any) -> tuple[bytes, str]:
+    body = orjson.dumps(jsonable_encoder(data))
+    return body, f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _conditional_response(request: Request, body: bytes, etag: str, cache_control: str | None) -> Response:
+    headers = {"ETag": etag}
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+NO_STORE = "no-store, no-cache, must-revalidate"
+
+
+def cache_control(value: str) -> Callable[[Response], None]:
+    """Dependency that sets a fixed Cache-Control header on the response.
+
+    Use as `dependencies=[Depends(cache_control(...))]` on routes that
+    return plain data rather than a Response of their own.
+    """
+    def set_header(response: Response) -> None:
+        response.headers["Cache-Control"] = value
+    return set_header
+
+
+def etag_json_response(request: Request, data: Any, cache_control: str = "private, no-cache") -> Response:
+    """Serialize `data` uncached, answering 304 when the client's copy matches.
+
+    For polled admin lists: the query still runs, but an unchanged result
+    is not re-sent. `no-cache` makes the browser revalidate every time.
+    """
+    body, etag = _serialize(data)
+    return _conditional_response(request, body, etag, cache_control)
+
+
+async def cached_json_response(
+    request: Request,
+    key: str,
+    load: Callable[[], Awaitable[Any]],
+    max_age: int | None = 300,
+    ttl: int | None = None,
+) -> Response:
+    """Serve `key` as pre-serialized JSON, calling `load()` on a cache miss.
+
+    The ETag is a hash of the body, so it is identical across workers and
+    a client revalidating with If-None-Match gets a 304 with no body.
+    `max_age` sets the Cache-Control header; None sends no header.
+    `ttl` overrides the cache's default lifetime for this key. If `load()`
+    fails and an expired copy is still held, that copy is served instead.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        try:
+            entry = _serialize(await load())
+        except Exception:
+            entry = cache.get_stale(key)
+            if entry is None:
+                raise
+            logging.exception(f"Refreshing cached {key!r} failed; serving stale copy")
+        else:
+            cache.set(key, entry, ttl)
+    body, etag = entry
 
-cache = TTLCache(ttl_seconds=300)  # 5-minute TTL
+    cache_control = f"public, max-age={max_age}" if max_age is not None else None
+    return _conditional_response(request, body, etag, cache_control)
@@ -1,7 +1,7 @@
 import os
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import update, delete
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,18 +15,21 @@ engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
+    # Per worker (see WEB_CONCURRENCY in the Dockerfile); Neon's pooler
+    # multiplexes these, so keep them modest rather than sizing for peak
     pool_size=5,
     max_overflow=5,
     pool_recycle=300,
+    # Room for every distinct statement shape across the routers (the
+    # optional list filters multiply them), so none get evicted and recompiled
+    query_cache_size=1200,
     connect_args={
         "prepared_statement_cache_size": 0,
         "statement_cache_size": 0,
     },
 )
 
-async_session_maker = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 async def init_db():
     async with engine.begin() as conn:
@@ -35,3 +38,24 @@ async def init_db():
 async def get_session() -> AsyncSession:
     async with async_session_maker() as session:
         yield session
+
+async def update_row(session: AsyncSession, model, id: str, data: dict):
+    """Apply `data` to the row with `id` via a single UPDATE ... RETURNING.
+
+    Returns the updated row, or None if no row matched.
+    """
+    data.pop("id", None)
+    if not data:
+        return await session.get(model, id)
+    result = await session.execute(
+        update(model).where(model.id == id).values(**data).returning(model)
+    )
+    return result.scalars().first()
+
+async def delete_row(session: AsyncSession, model, id: str):
+    """Delete the row with `id` via a single DELETE ... RETURNING.
+
+    Returns the deleted row, or None if no row matched.
+    """
+    result = await session.execute(delete(model).where(model.id == id).returning(model))
+    return result.scalars().first()
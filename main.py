@@ -3,6 +3,7 @@ import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -39,6 +40,7 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url=None if _is_prod else "/docs",
     redoc_url=None if _is_prod else "/redoc",
     openapi_url=None if _is_prod else "/openapi.json",
@@ -47,8 +49,9 @@ app = FastAPI(
 # Timeout Middleware (outermost — wraps everything)
 app.add_middleware(TimeoutMiddleware)
 
-# Compression Middleware
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compression Middleware — level 6 is zlib's default and compresses JSON
+# almost as well as Starlette's default of 9 for a fraction of the CPU
+app.add_middleware(GZipMiddleware, minimum_size=2000, compresslevel=6)
 
 # CORS Configuration
 app.add_middleware(
@@ -62,6 +65,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset cursor for the next /admin/orders page
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.mount("/public", StaticFiles(directory="public"), name="public")
@@ -7,7 +7,8 @@ from dotenv import load_dotenv
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Set SQL_DEBUG=1 to log the statements being run
+engine = create_async_engine(DATABASE_URL, echo=bool(os.getenv("SQL_DEBUG")))
 
 async def drop_item_status():
     async with engine.begin() as conn:
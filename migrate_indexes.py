@@ -0,0 +1,46 @@
+import asyncio
+import os
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import text
+from dotenv import load_dotenv
+
+load_dotenv()
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+# Set SQL_DEBUG=1 to log the statements being run
+engine = create_async_engine(DATABASE_URL, echo=bool(os.getenv("SQL_DEBUG")))
+
+# (description, statement) — each runs in its own transaction and is idempotent
+INDEXES = [
+    ("pg_trgm extension", "CREATE EXTENSION IF NOT EXISTS pg_trgm;"),
+    # Lets the unanchored `name ILIKE '%...%'` search in /listings use an index
+    ("listing name trigram index", "CREATE INDEX IF NOT EXISTS ix_listing_name_trgm ON listing USING gin (name gin_trgm_ops);"),
+    ("hero active/priority index", "CREATE INDEX IF NOT EXISTS ix_herocontent_active_priority ON herocontent (is_active, priority);"),
+    # Serves /orders (WHERE user_id = ? ORDER BY created_at DESC) with a backward index scan
+    ("order user/created_at index", 'CREATE INDEX IF NOT EXISTS ix_order_user_created ON "order" (user_id, created_at);'),
+    # Admin orders list (ORDER BY created_at DESC) and payment verification lookups
+    ("order created_at index", 'CREATE INDEX IF NOT EXISTS ix_order_created_at ON "order" (created_at);'),
+    ("order razorpay_order_id index", 'CREATE INDEX IF NOT EXISTS ix_order_razorpay_order_id ON "order" (razorpay_order_id);'),
+    # Brands-in-subcategory EXISTS probe behind /brands?subCategory_id=
+    ("listing subcategory/brand index", "CREATE INDEX IF NOT EXISTS ix_listing_subcategory_brand ON listing (subcategory_id, brand_id);"),
+    # Filtered /listings pages: equality on the filter column, rows already in
+    # ORDER BY created_at DESC NULLS LAST order, so LIMIT stops early without a sort
+    ("listing category/created_at index", "CREATE INDEX IF NOT EXISTS ix_listing_category_created ON listing (category_id, created_at DESC NULLS LAST);"),
+    ("listing subcategory/created_at index", "CREATE INDEX IF NOT EXISTS ix_listing_subcategory_created ON listing (subcategory_id, created_at DESC NULLS LAST);"),
+    ("listing brand/created_at index", "CREATE INDEX IF NOT EXISTS ix_listing_brand_created ON listing (brand_id, created_at DESC NULLS LAST);"),
+    # Partial indexes: the dashboard revenue sum and the single active notice
+    ("order revenue index", """CREATE INDEX IF NOT EXISTS ix_order_revenue ON "order" (status, total_amount) WHERE status IN ('paid', 'shipped', 'delivered');"""),
+    ("active notice index", "CREATE INDEX IF NOT EXISTS ix_globalnotice_active ON globalnotice (is_active) WHERE is_active;"),
+]
+
+async def create_indexes():
+    for name, statement in INDEXES:
+        async with engine.begin() as conn:
+            try:
+                await conn.execute(text(statement))
+                print(f"Created {name}.")
+            except Exception as e:
+                print(f"Error creating {name}: {e}")
+
+if __name__ == "__main__":
+    asyncio.run(create_indexes())
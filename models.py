@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, JSON
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index, text
 from uuid import uuid4, UUID
 from typing import Optional, Dict, Any,List
 from enum import Enum
@@ -17,6 +17,13 @@ class Product(SQLModel, table=True):
     specs: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
 
 class Listing(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_listing_subcategory_brand", "subcategory_id", "brand_id"),
+        # Filtered /listings pages, pre-sorted for ORDER BY created_at DESC NULLS LAST
+        Index("ix_listing_category_created", "category_id", text("created_at DESC NULLS LAST")),
+        Index("ix_listing_subcategory_created", "subcategory_id", text("created_at DESC NULLS LAST")),
+        Index("ix_listing_brand_created", "brand_id", text("created_at DESC NULLS LAST")),
+    )
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     category_id: str = Field(index=True)
     subcategory_id: Optional[str] = Field(default=None, index=True)
@@ -67,6 +74,7 @@ class Brand(SQLModel, table=True):
     logo_url: str | None = None  # optional
 
 class HeroContent(SQLModel, table=True):
+    __table_args__ = (Index("ix_herocontent_active_priority", "is_active", "priority"),)
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     type: str = Field(default="newest") # 'newest', 'offer', 'manual_banner', 'featured'
     title: str
@@ -97,16 +105,24 @@ class ReturnStatus(str, Enum):
     REJECTED = "rejected"
 
 class Order(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_order_user_created", "user_id", "created_at"),
+        # Partial index covering the dashboard revenue sum
+        Index(
+            "ix_order_revenue", "status", "total_amount",
+            postgresql_where=text("status IN ('paid', 'shipped', 'delivered')"),
+        ),
+    )
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     user_id: UUID = Field(foreign_key="neon_auth.user.id", index=True)
-    razorpay_order_id: Optional[str] = None
+    razorpay_order_id: Optional[str] = Field(default=None, index=True)
     razorpay_payment_id: Optional[str] = None
     items: List[Dict[str, Any]] = Field(default_factory=list, sa_column=Column(JSON))
     shipping_address: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
     shipping_fee: float = Field(default=0.0)
     total_amount: float
     status: OrderStatus = Field(default=OrderStatus.REQUESTED, sa_column=Column(String, default=OrderStatus.REQUESTED.value, index=True))
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat(), index=True)
 
 class ReturnRequest(SQLModel, table=True):
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
@@ -124,6 +140,7 @@ class CheckoutDetails(SQLModel, table=True):
     pincode: Optional[str] = None
 
 class GlobalNotice(SQLModel, table=True):
+    __table_args__ = (Index("ix_globalnotice_active", "is_active", postgresql_where=text("is_active")),)
     id: str = Field(default_factory=lambda: str(uuid4()), primary_key=True)
     message: str
     type: str = Field(default="info")  # 'info', 'warning', 'promo', 'urgent'
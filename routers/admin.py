@@ -1,20 +1,23 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, BackgroundTasks, Response
+from fastapi import Request as HTTPRequest  # models.Request is the product-request table
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func
+from sqlalchemy import func, update, literal_column, String, nulls_last, desc, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime, timezone
 
-from db import get_session
+from db import get_session, update_row, delete_row
 from models import (
     User, Listing, Category, SubCategory, Brand, HeroContent,
     Order, OrderStatus, ReturnRequest, ReturnStatus, GlobalNotice,
     SupportTicket, SupportTicketStatus, Request
 )
 from auth import admin_only
-from cache import cache
+from cache import cache, TTLCache, etag_json_response
+from routers.public import encode_cursor, decode_cursor
 from helpers.email_service import (
     send_order_status_update_email, send_return_status_email,
     send_support_reply_email, send_order_confirmation_email
@@ -22,6 +25,12 @@ from helpers.email_service import (
 
 router = APIRouter()
 
+# Dashboard figures may lag by up to a minute; saves five aggregates per refresh
+stats_cache = TTLCache(ttl_seconds=60)
+
+# Order statuses counted as revenue; matches the ix_order_revenue partial index
+_REVENUE_STATUSES = (OrderStatus.PAID.value, OrderStatus.SHIPPED.value, OrderStatus.DELIVERED.value)
+
 
 # --- Shared Pydantic models used by admin routes ---
 
@@ -38,13 +47,27 @@ class SupportReplyData(BaseModel):
 
 # --- Listings ---
 
-@router.get("/admin/listings", response_model=List[Listing])
+# Admin list endpoints return trusted DB rows: the schema is declared via
+# `responses=` for OpenAPI and the rows are not re-validated on the way out.
+@router.get("/admin/listings", response_model=None, responses={200: {"model": List[Listing]}})
 async def admin_list_listings(
+    request: HTTPRequest,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Listing))
-    return result.scalars().all()
+    # Paging is opt-in: without `limit` the full list is returned as before.
+    # created_at is nullable, so pages use offset with a stable id tiebreak.
+    stmt = select(Listing)
+    if limit:
+        stmt = (
+            stmt.order_by(nulls_last(desc(Listing.created_at)), Listing.id)
+            .offset(skip)
+            .limit(limit)
+        )
+    result = await session.execute(stmt)
+    return etag_json_response(request, result.scalars().all())
 
 @router.post("/admin/listing", response_model=Listing)
 async def admin_create_listing(
@@ -54,9 +77,23 @@ async def admin_create_listing(
 ):
     session.add(listing)
     await session.commit()
-    await session.refresh(listing)
+    cache.invalidate("hero:active")
     return listing
 
+@router.post("/admin/listings/bulk", response_model=None, responses={200: {"model": List[Listing]}})
+async def admin_create_listings_bulk(
+    # Capped so one request can't build an arbitrarily large transaction
+    listings: List[Listing] = Body(..., max_length=100),
+    current_user: User = Depends(admin_only),
+    session: AsyncSession = Depends(get_session)
+):
+    # Flushed as batched multi-row INSERTs (insertmanyvalues), not one per listing.
+    # All column values are generated client-side, so no refresh is needed.
+    session.add_all(listings)
+    await session.commit()
+    cache.invalidate("hero:active")
+    return listings
+
 @router.put("/admin/listing/{id}", response_model=Listing)
 async def admin_update_listing(
     id: str,
@@ -64,16 +101,11 @@ async def admin_update_listing(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Listing).where(Listing.id == id))
-    db_listing = result.scalars().first()
+    db_listing = await update_row(session, Listing, id, listing_update.model_dump(exclude_unset=True))
     if not db_listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    update_data = listing_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_listing, key, value)
-    session.add(db_listing)
     await session.commit()
-    await session.refresh(db_listing)
+    cache.invalidate("hero:active")
     return db_listing
 
 @router.delete("/admin/listing/{id}")
@@ -82,12 +114,11 @@ async def admin_delete_listing(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Listing).where(Listing.id == id))
-    db_listing = result.scalars().first()
+    db_listing = await delete_row(session, Listing, id)
     if not db_listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    await session.delete(db_listing)
     await session.commit()
+    cache.invalidate("hero:active")
     return {"message": "Listing deleted successfully"}
 
 
@@ -101,7 +132,6 @@ async def admin_create_category(
 ):
     session.add(category)
     await session.commit()
-    await session.refresh(category)
     cache.invalidate("categories")
     return category
 
@@ -112,16 +142,10 @@ async def admin_update_category(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Category).where(Category.id == id))
-    db_cat = result.scalars().first()
+    db_cat = await update_row(session, Category, id, category_update.model_dump(exclude_unset=True))
     if not db_cat:
         raise HTTPException(status_code=404, detail="Category not found")
-    update_data = category_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_cat, key, value)
-    session.add(db_cat)
     await session.commit()
-    await session.refresh(db_cat)
     cache.invalidate("categories")
     return db_cat
 
@@ -131,11 +155,9 @@ async def admin_delete_category(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Category).where(Category.id == id))
-    db_cat = result.scalars().first()
+    db_cat = await delete_row(session, Category, id)
     if not db_cat:
         raise HTTPException(status_code=404, detail="Category not found")
-    await session.delete(db_cat)
     await session.commit()
     cache.invalidate("categories")
     return {"message": "Category deleted successfully"}
@@ -151,7 +173,6 @@ async def admin_create_subcategory(
 ):
     session.add(subcategory)
     await session.commit()
-    await session.refresh(subcategory)
     # Invalidate all subcategory cache keys (any category_id variant)
     cache.invalidate(f"subcategories:{subcategory.category_id}")
     cache.invalidate("subcategories:all")
@@ -164,16 +185,10 @@ async def admin_update_subcategory(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(SubCategory).where(SubCategory.id == id))
-    db_sub = result.scalars().first()
+    db_sub = await update_row(session, SubCategory, id, subcategory_update.model_dump(exclude_unset=True))
     if not db_sub:
         raise HTTPException(status_code=404, detail="Subcategory not found")
-    update_data = subcategory_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_sub, key, value)
-    session.add(db_sub)
     await session.commit()
-    await session.refresh(db_sub)
     cache.invalidate(f"subcategories:{db_sub.category_id}")
     cache.invalidate("subcategories:all")
     return db_sub
@@ -184,12 +199,10 @@ async def admin_delete_subcategory(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(SubCategory).where(SubCategory.id == id))
-    db_sub = result.scalars().first()
+    db_sub = await delete_row(session, SubCategory, id)
     if not db_sub:
         raise HTTPException(status_code=404, detail="Subcategory not found")
     category_id = db_sub.category_id
-    await session.delete(db_sub)
     await session.commit()
     cache.invalidate(f"subcategories:{category_id}")
     cache.invalidate("subcategories:all")
@@ -206,7 +219,6 @@ async def admin_create_brand(
 ):
     session.add(brand)
     await session.commit()
-    await session.refresh(brand)
     cache.invalidate("brands:all")
     return brand
 
@@ -217,16 +229,10 @@ async def admin_update_brand(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Brand).where(Brand.id == id))
-    db_brand = result.scalars().first()
+    db_brand = await update_row(session, Brand, id, brand_update.model_dump(exclude_unset=True))
     if not db_brand:
         raise HTTPException(status_code=404, detail="Brand not found")
-    update_data = brand_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_brand, key, value)
-    session.add(db_brand)
     await session.commit()
-    await session.refresh(db_brand)
     cache.invalidate("brands:all")
     return db_brand
 
@@ -236,11 +242,9 @@ async def admin_delete_brand(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Brand).where(Brand.id == id))
-    db_brand = result.scalars().first()
+    db_brand = await delete_row(session, Brand, id)
     if not db_brand:
         raise HTTPException(status_code=404, detail="Brand not found")
-    await session.delete(db_brand)
     await session.commit()
     cache.invalidate("brands:all")
     return {"message": "Brand deleted successfully"}
@@ -248,13 +252,14 @@ async def admin_delete_brand(
 
 # --- Hero Content ---
 
-@router.get("/admin/hero", response_model=List[HeroContent])
+@router.get("/admin/hero", response_model=None, responses={200: {"model": List[HeroContent]}})
 async def admin_list_hero(
+    request: HTTPRequest,
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
     result = await session.execute(select(HeroContent).order_by(HeroContent.priority))
-    return result.scalars().all()
+    return etag_json_response(request, result.scalars().all())
 
 @router.post("/admin/hero", response_model=HeroContent)
 async def admin_create_hero(
@@ -264,7 +269,7 @@ async def admin_create_hero(
 ):
     session.add(hero)
     await session.commit()
-    await session.refresh(hero)
+    cache.invalidate("hero:active")
     return hero
 
 @router.put("/admin/hero/{id}", response_model=HeroContent)
@@ -274,16 +279,11 @@ async def admin_update_hero(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(HeroContent).where(HeroContent.id == id))
-    db_hero = result.scalars().first()
+    db_hero = await update_row(session, HeroContent, id, hero_update.model_dump(exclude_unset=True))
     if not db_hero:
         raise HTTPException(status_code=404, detail="Hero content not found")
-    update_data = hero_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_hero, key, value)
-    session.add(db_hero)
     await session.commit()
-    await session.refresh(db_hero)
+    cache.invalidate("hero:active")
     return db_hero
 
 @router.delete("/admin/hero/{id}")
@@ -292,36 +292,72 @@ async def admin_delete_hero(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(HeroContent).where(HeroContent.id == id))
-    db_hero = result.scalars().first()
+    db_hero = await delete_row(session, HeroContent, id)
     if not db_hero:
         raise HTTPException(status_code=404, detail="Hero content not found")
-    await session.delete(db_hero)
     await session.commit()
+    cache.invalidate("hero:active")
     return {"message": "Hero content deleted successfully"}
 
 
 # --- Orders (Admin) ---
 
-@router.get("/admin/orders", response_model=List[Order])
+# Narrow projection for list views: skips the JSON items/shipping_address columns
+_ORDER_SUMMARY_COLUMNS = (
+    Order.id, Order.user_id, Order.status, Order.total_amount,
+    Order.shipping_fee, Order.created_at,
+)
+
+@router.get("/admin/orders", response_model=None, responses={200: {"model": List[Order]}})
 async def admin_get_all_orders(
+    request: HTTPRequest,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    summary: bool = Query(False, description="Omit items and shipping_address"),
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Order).order_by(Order.created_at.desc()))
-    return result.scalars().all()
+    # Keyset pagination: without `limit` the full list is returned as before.
+    # id breaks created_at ties so no order is skipped at a page boundary.
+    stmt = select(*_ORDER_SUMMARY_COLUMNS) if summary else select(Order)
+    stmt = stmt.order_by(Order.created_at.desc(), Order.id.desc())
+    if cursor:
+        last_created, last_id = decode_cursor(cursor)
+        if last_created is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(Order.created_at, Order.id) < tuple_(last_created, last_id))
+    if limit:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    data = [row._asdict() for row in result.all()] if summary else result.scalars().all()
+
+    response = etag_json_response(request, data)
+    if limit and len(data) == limit:
+        last = data[-1]
+        if summary:
+            response.headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["id"])
+        else:
+            response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return response
 
 @router.put("/admin/orders/{id}/status", response_model=Order)
 async def admin_update_order_status(
     id: str,
     update_data: OrderStatusUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Order).where(Order.id == id))
-    order = result.scalars().first()
-    if not order:
+    # Order and its customer (for the notification email) in one query
+    result = await session.execute(
+        select(Order, User)
+        .join(User, Order.user_id == User.id, isouter=True)
+        .where(Order.id == id)
+    )
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Order not found")
+    order, user = row
     order.status = update_data.status
 
     # Allow admin to set a final negotiated price when converting request to order
@@ -331,7 +367,6 @@ async def admin_update_order_status(
     session.add(order)
     try:
         await session.commit()
-        await session.refresh(order)
     except Exception as e:
         await session.rollback()
         logging.error(f"Database error updating order status: {e}")
@@ -339,26 +374,21 @@ async def admin_update_order_status(
 
     # Only notify the customer for shipped/delivered — return statuses are
     # handled by the dedicated returns flow (send_return_status_email).
+    # Sent after the response; the sender logs its own failures.
     NOTIFIABLE_STATUSES = {OrderStatus.SHIPPED, OrderStatus.DELIVERED}
-    if update_data.status in NOTIFIABLE_STATUSES:
-        user_result = await session.execute(select(User).where(User.id == order.user_id))
-        user = user_result.scalars().first()
-        if user:
-            try:
-                # Use update_data.status.value (guaranteed enum) instead of
-                # order.status.value — after session.refresh(), the Column(String)
-                # column returns a plain str, so .value raises AttributeError and
-                # the email was silently swallowed by the except block.
-                await send_order_status_update_email(
-                    user_email=user.email,
-                    user_name=user.name or "Customer",
-                    order_id=str(order.id),
-                    new_status=update_data.status.value,
-                    amount=order.total_amount,
-                    items=order.items
-                )
-            except Exception as e:
-                logging.error(f"Failed to send order status update email: {e}")
+    if update_data.status in NOTIFIABLE_STATUSES and user:
+        # Use update_data.status.value (guaranteed enum) instead of
+        # order.status.value — rows loaded from the Column(String) column
+        # hold a plain str, where .value raises AttributeError.
+        background_tasks.add_task(
+            send_order_status_update_email,
+            user_email=user.email,
+            user_name=user.name or "Customer",
+            order_id=str(order.id),
+            new_status=update_data.status.value,
+            amount=order.total_amount,
+            items=order.items
+        )
 
     return order
 
@@ -398,19 +428,29 @@ async def admin_get_all_returns(
 async def admin_update_return_status(
     id: str,
     update_data: ReturnStatusUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(ReturnRequest).where(ReturnRequest.id == id))
-    return_req = result.scalars().first()
-    if not return_req:
+    # Return, its order and the customer (for the email) in one joined query
+    result = await session.execute(
+        select(ReturnRequest, Order, User)
+        .join(Order, ReturnRequest.order_id == Order.id, isouter=True)
+        .join(User, ReturnRequest.user_id == User.id, isouter=True)
+        .where(ReturnRequest.id == id)
+    )
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Return request not found")
+    return_req, order, user = row
+
+    # Idempotent retries: nothing to write and no email to resend
+    if return_req.status == update_data.status:
+        return return_req
 
     return_req.status = update_data.status
     session.add(return_req)
 
-    order_result = await session.execute(select(Order).where(Order.id == return_req.order_id))
-    order = order_result.scalars().first()
     if order:
         if update_data.status == ReturnStatus.APPROVED:
             order.status = OrderStatus.RETURNED
@@ -420,68 +460,85 @@ async def admin_update_return_status(
 
     try:
         await session.commit()
-        await session.refresh(return_req)
     except Exception as e:
         await session.rollback()
         logging.error(f"Error updating return status: {e}")
         raise HTTPException(status_code=500, detail="Failed to update return status")
 
-    user_result = await session.execute(select(User).where(User.id == return_req.user_id))
-    user = user_result.scalars().first()
+    # Sent after the response; the sender logs its own failures
     if user and order:
-        try:
-            email_status = "returned" if update_data.status == ReturnStatus.APPROVED else "rejected"
-            await send_return_status_email(
-                user_email=user.email,
-                user_name=user.name or "Customer",
-                order_id=str(order.id),
-                return_status=email_status,
-                amount=order.total_amount,
-                items=order.items
-            )
-        except Exception as e:
-            logging.error(f"Failed to send return status email: {e}")
+        email_status = "returned" if update_data.status == ReturnStatus.APPROVED else "rejected"
+        background_tasks.add_task(
+            send_return_status_email,
+            user_email=user.email,
+            user_name=user.name or "Customer",
+            order_id=str(order.id),
+            return_status=email_status,
+            amount=order.total_amount,
+            items=order.items
+        )
 
     return return_req
 
 
 # --- Dashboard Stats ---
 
+# All five figures in one statement / one round trip. Built once at import:
+# the statement takes no parameters, so there is nothing to rebuild per call.
+_DASHBOARD_STATS = select(
+    select(func.count(Listing.id)).scalar_subquery().label("products"),
+    select(func.count(Order.id)).scalar_subquery().label("orders"),
+    select(func.coalesce(func.sum(Order.total_amount), 0.0))
+    .where(Order.status.in_(_REVENUE_STATUSES))
+    .scalar_subquery().label("revenue"),
+    select(func.count(Request.id)).scalar_subquery().label("requests"),
+    select(func.count(SupportTicket.id))
+    .where(SupportTicket.status == SupportTicketStatus.OPEN)
+    .scalar_subquery().label("open_tickets"),
+)
+
 @router.get("/admin/dashboard-stats")
 async def get_admin_dashboard_stats(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    products_count = (await session.execute(select(func.count(Listing.id)))).scalar() or 0
-    orders_count = (await session.execute(select(func.count(Order.id)))).scalar() or 0
-    revenue_result = await session.execute(
-        select(func.sum(Order.total_amount))
-        .where(Order.status.in_([OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.DELIVERED]))
-    )
-    revenue_sum = revenue_result.scalar() or 0.0
-    requests_count = (await session.execute(select(func.count(Request.id)))).scalar() or 0
-    open_tickets = (await session.execute(
-        select(func.count(SupportTicket.id)).where(SupportTicket.status == SupportTicketStatus.OPEN)
-    )).scalar() or 0
-
-    return {
-        "totalProducts": products_count,
-        "totalOrders": orders_count,
-        "revenue": revenue_sum,
-        "pendingRequests": requests_count,
-        "openTickets": open_tickets
+    cached = stats_cache.get("dashboard")
+    if cached is not None:
+        return cached
+
+    stats = (await session.execute(_DASHBOARD_STATS)).one()
+
+    data = {
+        "totalProducts": stats.products,
+        "totalOrders": stats.orders,
+        "revenue": stats.revenue,
+        "pendingRequests": stats.requests,
+        "openTickets": stats.open_tickets
     }
+    stats_cache.set("dashboard", data)
+    return data
 
 
 # --- Notices (Admin write) ---
 
-@router.get("/admin/notice")
+# Postgres renders the whole list as one JSON array; no ORM rows involved
+_notices = GlobalNotice.__table__
+_NOTICE_LIST_JSON = select(func.coalesce(
+    func.json_agg(aggregate_order_by(_notices.table_valued(), _notices.c.created_at.desc())),
+    literal_column("'[]'::json"),
+    type_=String,
+)).select_from(_notices)
+
+# Fields an admin may change on an existing notice
+_NOTICE_FIELDS = frozenset({"message", "type", "is_active"})
+
+@router.get("/admin/notice", responses={200: {"model": List[GlobalNotice]}})
 async def get_all_notices(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(GlobalNotice).order_by(GlobalNotice.created_at.desc()))
-    return result.scalars().all()
+    body = (await session.execute(_NOTICE_LIST_JSON)).scalar_one()
+    return Response(content=body, media_type="application/json")
 
 @router.post("/admin/notice")
 async def create_notice(
@@ -489,13 +546,11 @@ async def create_notice(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    existing = await session.execute(select(GlobalNotice).where(GlobalNotice.is_active == True))
-    for n in existing.scalars().all():
-        n.is_active = False
-        session.add(n)
+    # Only one notice is active at a time: deactivate the rest in one statement
+    await session.execute(update(GlobalNotice).where(GlobalNotice.is_active == True).values(is_active=False))
     session.add(notice_data)
     await session.commit()
-    await session.refresh(notice_data)
+    cache.invalidate("notice:active")
     return notice_data
 
 @router.put("/admin/notice/{notice_id}")
@@ -505,16 +560,12 @@ async def update_notice(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(GlobalNotice).where(GlobalNotice.id == notice_id))
-    notice = result.scalars().first()
+    patch = {k: v for k, v in notice_data.items() if k in _NOTICE_FIELDS}
+    notice = await update_row(session, GlobalNotice, notice_id, patch)
     if not notice:
         raise HTTPException(status_code=404, detail="Notice not found")
-    for key, value in notice_data.items():
-        if hasattr(notice, key) and key != "id":
-            setattr(notice, key, value)
-    session.add(notice)
     await session.commit()
-    await session.refresh(notice)
+    cache.invalidate("notice:active")
     return notice
 
 @router.delete("/admin/notice/{notice_id}")
@@ -523,12 +574,11 @@ async def delete_notice(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(GlobalNotice).where(GlobalNotice.id == notice_id))
-    notice = result.scalars().first()
+    notice = await delete_row(session, GlobalNotice, notice_id)
     if not notice:
         raise HTTPException(status_code=404, detail="Notice not found")
-    await session.delete(notice)
     await session.commit()
+    cache.invalidate("notice:active")
     return {"message": "Notice deleted"}
 
 
@@ -536,47 +586,44 @@ async def delete_notice(
 
 @router.get("/admin/support")
 async def admin_get_all_tickets(
+    request: HTTPRequest,
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
     result = await session.execute(select(SupportTicket).order_by(SupportTicket.created_at.desc()))
-    return result.scalars().all()
+    return etag_json_response(request, result.scalars().all())
 
 @router.put("/admin/support/{id}/reply")
 async def admin_reply_ticket(
     id: str,
     reply_data: SupportReplyData,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(SupportTicket).where(SupportTicket.id == id))
-    ticket = result.scalars().first()
+    ticket = await update_row(session, SupportTicket, id, {
+        "admin_reply": reply_data.reply,
+        "status": SupportTicketStatus.REPLIED,
+        "replied_at": datetime.now(timezone.utc).isoformat(),
+    })
     if not ticket:
         raise HTTPException(status_code=404, detail="Support ticket not found")
 
-    ticket.admin_reply = reply_data.reply
-    ticket.status = SupportTicketStatus.REPLIED
-    ticket.replied_at = datetime.now(timezone.utc).isoformat()
-    session.add(ticket)
-
     try:
         await session.commit()
-        await session.refresh(ticket)
     except Exception as e:
         await session.rollback()
         logging.error(f"Error updating support ticket: {e}")
         raise HTTPException(status_code=500, detail="Failed to save reply")
 
-    try:
-        await send_support_reply_email(
-            user_email=ticket.user_email,
-            user_name=ticket.user_name,
-            original_subject=ticket.subject,
-            admin_reply=reply_data.reply,
-            ticket_id=ticket.id
-        )
-    except Exception as e:
-        logging.error(f"Failed to send support reply email: {e}")
+    background_tasks.add_task(
+        send_support_reply_email,
+        user_email=ticket.user_email,
+        user_name=ticket.user_name,
+        original_subject=ticket.subject,
+        admin_reply=reply_data.reply,
+        ticket_id=ticket.id
+    )
 
     return ticket
 
@@ -586,17 +633,12 @@ async def admin_close_ticket(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(SupportTicket).where(SupportTicket.id == id))
-    ticket = result.scalars().first()
+    ticket = await update_row(session, SupportTicket, id, {"status": SupportTicketStatus.CLOSED})
     if not ticket:
         raise HTTPException(status_code=404, detail="Support ticket not found")
 
-    ticket.status = SupportTicketStatus.CLOSED
-    session.add(ticket)
-
     try:
         await session.commit()
-        await session.refresh(ticket)
     except Exception as e:
         await session.rollback()
         logging.error(f"Error closing support ticket: {e}")
@@ -608,22 +650,21 @@ async def admin_close_ticket(
 # --- Test Email ---
 
 @router.post("/test-email")
-async def test_email_rendering(email: str = Query(..., description="Email address to send test to")):
-    from datetime import datetime, timezone
-    from helpers.email_service import send_order_confirmation_email
+async def test_email_rendering(
+    background_tasks: BackgroundTasks,
+    email: str = Query(..., description="Email address to send test to"),
+):
     items = [
         {"name": "Awesome Product 1", "quantity": 1, "price": 499},
         {"name": "Cool Gadget B", "quantity": 2, "price": 1000}
     ]
-    try:
-        await send_order_confirmation_email(
-            user_email=email,
-            user_name="Test User",
-            order_id="TEST-ORD-123456",
-            amount=2499.0,
-            items=items,
-            created_at=datetime.now(timezone.utc).isoformat()
-        )
-        return {"message": f"Test email sent to {email}"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    background_tasks.add_task(
+        send_order_confirmation_email,
+        user_email=email,
+        user_name="Test User",
+        order_id="TEST-ORD-123456",
+        amount=2499.0,
+        items=items,
+        created_at=datetime.now(timezone.utc).isoformat()
+    )
+    return {"message": f"Test email queued for {email}"}
@@ -1,8 +1,10 @@
 import os
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, cast, Numeric, update
+from sqlalchemy.dialects.postgresql import insert
 from typing import List
 from pydantic import BaseModel
 from typing import Dict, Optional
@@ -11,6 +13,8 @@ from db import get_session
 from models import User, ShoppingCart, Order, OrderStatus, CheckoutDetails, RedeemCode
 from auth import get_db_user
 from helpers.email_service import send_order_confirmation_email, send_email_to_admin
+from routers.redeem_codes import redeem_cache
+from cache import cache_control, NO_STORE
 
 # --- FUTURE: Razorpay Payment Integration ---
 # from helpers.verify_payment_sig import get_razorpay_client, verify_payment as verify_razorpay_payment
@@ -18,6 +22,23 @@ from helpers.email_service import send_order_confirmation_email, send_email_to_a
 router = APIRouter()
 
 
+# Cart subtotal evaluated by Postgres over the JSON items array, fetched in the
+# same round trip as the cart row itself.
+_cart_item = func.json_array_elements(ShoppingCart.items).table_valued("value").alias("cart_item")
+_cart_subtotal = (
+    select(func.coalesce(func.sum(
+        func.coalesce(cast(_cart_item.c.value.op("->>")("price"), Numeric), 0)
+        * func.coalesce(cast(_cart_item.c.value.op("->>")("quantity"), Numeric), 1)
+    ), 0))
+    .select_from(_cart_item)
+    .scalar_subquery()
+    .label("subtotal")
+)
+
+
+_CHECKOUT_FIELDS = ("phone", "address", "city", "pincode")
+
+
 class OrderData(BaseModel):
     shipping_address: Dict
     shipping_fee: float
@@ -38,24 +59,29 @@ class OrderStatusUpdate(BaseModel):
 @router.post("/orders")
 async def create_order(
     order_data: OrderData,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_db_user),
     session: AsyncSession = Depends(get_session),
 ):
-    result = await session.execute(select(ShoppingCart).where(ShoppingCart.user_id == current_user.id))
-    cart = result.scalars().first()
+    stmt = select(ShoppingCart, _cart_subtotal).where(ShoppingCart.user_id == current_user.id)
+    if order_data.redeem_code:
+        # The redeem code rides along on the cart row (NULL when it doesn't exist)
+        stmt = stmt.add_columns(RedeemCode).outerjoin(
+            RedeemCode, RedeemCode.code == order_data.redeem_code.strip().upper()
+        )
+    result = await session.execute(stmt)
+    row = result.first()
 
-    if not cart or not cart.items:
+    if not row or not row.ShoppingCart.items:
         raise HTTPException(status_code=400, detail="Cart is empty")
 
-    subtotal = sum(item.get('price', 0) * item.get('quantity', 1) for item in cart.items)
+    cart = row.ShoppingCart
+    subtotal = float(row.subtotal)
     discount = 0.0
     applied_redeem_code = None
 
     if order_data.redeem_code:
-        code_result = await session.execute(
-            select(RedeemCode).where(RedeemCode.code == order_data.redeem_code.strip().upper())
-        )
-        redeem = code_result.scalars().first()
+        redeem = row.RedeemCode
         if not redeem or not redeem.is_active or redeem.times_redeemed >= redeem.max_redeems:
             raise HTTPException(status_code=400, detail="Invalid or expired redeem code")
         if redeem.discount_type == "percentage":
@@ -76,28 +102,39 @@ async def create_order(
     )
     session.add(new_order)
 
-    db_details = await session.execute(select(CheckoutDetails).where(CheckoutDetails.user_id == current_user.id))
-    detail = db_details.scalars().first()
+    # Upsert saved checkout details; only fields present in the address overwrite
     address_data = order_data.shipping_address
-    if not detail:
-        detail = CheckoutDetails(user_id=current_user.id)
-    detail.phone = address_data.get('phone', detail.phone)
-    detail.address = address_data.get('address', detail.address)
-    detail.city = address_data.get('city', detail.city)
-    detail.pincode = address_data.get('pincode', detail.pincode)
-    session.add(detail)
+    details = {k: address_data[k] for k in _CHECKOUT_FIELDS if k in address_data}
+    upsert = insert(CheckoutDetails).values(user_id=current_user.id, **details)
+    if details:
+        upsert = upsert.on_conflict_do_update(index_elements=[CheckoutDetails.user_id], set_=details)
+    else:
+        upsert = upsert.on_conflict_do_nothing(index_elements=[CheckoutDetails.user_id])
+    await session.execute(upsert)
 
     if applied_redeem_code:
-        applied_redeem_code.times_redeemed += 1
-        session.add(applied_redeem_code)
-        
+        # Atomic increment guarded by the same rules checked above: of two
+        # orders racing for a code's last use, only one still matches here
+        claimed = await session.execute(
+            update(RedeemCode)
+            .where(
+                RedeemCode.id == applied_redeem_code.id,
+                RedeemCode.is_active == True,
+                RedeemCode.times_redeemed < RedeemCode.max_redeems,
+            )
+            .values(times_redeemed=RedeemCode.times_redeemed + 1)
+            .returning(RedeemCode.id)
+        )
+        if claimed.first() is None:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Invalid or expired redeem code")
+
     # Clear the cart upon successful booking request
     cart.items = []
     session.add(cart)
 
     try:
         await session.commit()
-        await session.refresh(new_order)
     except Exception as e:
         await session.rollback()
         logging.error(f"Database error saving order: {e}")
@@ -106,15 +143,17 @@ async def create_order(
             detail="Could not process order."
         )
 
-    # Let admin know there is a new booking request
-    try:
-        await send_email_to_admin(
-            "new_booking_request",
-            f"Booking Request {new_order.id} has been placed",
-            f"Booking Request placed by {current_user.name} for items {', '.join([item['name'] for item in new_order.items])} and total amount is {new_order.total_amount}"
-        )
-    except Exception as e:
-        logging.error(f"Failed to send booking request email to admin: {e}")
+    if applied_redeem_code:
+        # Its remaining-uses count just changed
+        redeem_cache.invalidate(applied_redeem_code.code)
+
+    # Let admin know there is a new booking request (sent after the response)
+    background_tasks.add_task(
+        send_email_to_admin,
+        "new_booking_request",
+        f"Booking Request {new_order.id} has been placed",
+        f"Booking Request placed by {current_user.name} for items {', '.join([item['name'] for item in new_order.items])} and total amount is {new_order.total_amount}"
+    )
 
     return {"status": "success", "order_id": new_order.id, "message": "Booking request received"}
 
@@ -125,6 +164,7 @@ async def create_order(
 # @router.post("/verify/payment")
 # async def verify_payment_endpoint(
 #     payment_deets: PaymentsDeets,
+#     background_tasks: BackgroundTasks,
 #     current_user: User = Depends(get_db_user),
 #     session: AsyncSession = Depends(get_session),
 #     client=Depends(get_razorpay_client),
@@ -161,35 +201,32 @@ async def create_order(
 #                     detail="Payment validated but failed to update order status."
 #                 )
 #
-#             try:
-#                 await send_order_confirmation_email(
-#                     user_email=current_user.email,
-#                     user_name=current_user.name or "Customer",
-#                     order_id=str(order.id),
-#                     amount=order.total_amount,
-#                     items=order.items,
-#                     created_at=order.created_at
-#                 )
-#                 await send_email_to_admin(
-#                     "new_order",
-#                     f"Order {order.id} has been placed",
-#                     f"Order placed by {current_user.name} for items {', '.join([item['name'] for item in order.items])} and total amount is {order.total_amount}"
-#                 )
-#             except Exception as e:
-#                 logging.error(f"Failed to send order confirmation emails: {e}")
+#             background_tasks.add_task(
+#                 send_order_confirmation_email,
+#                 user_email=current_user.email,
+#                 user_name=current_user.name or "Customer",
+#                 order_id=str(order.id),
+#                 amount=order.total_amount,
+#                 items=order.items,
+#                 created_at=order.created_at
+#             )
+#             background_tasks.add_task(
+#                 send_email_to_admin,
+#                 "new_order",
+#                 f"Order {order.id} has been placed",
+#                 f"Order placed by {current_user.name} for items {', '.join([item['name'] for item in order.items])} and total amount is {order.total_amount}"
+#             )
 #
 #         return {"status": "success", "message": "Payment verified successfully", "order_id": order.id if order else None}
 #     else:
 #         raise HTTPException(status_code=400, detail="Signature verification failed")
 
 
-@router.get("/user/shipping_address")
+@router.get("/user/shipping_address", dependencies=[Depends(cache_control(NO_STORE))])
 async def get_user_shipping_address(
-    response: Response,
     current_user: User = Depends(get_db_user),
     session: AsyncSession = Depends(get_session)
 ):
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
     result = await session.execute(select(CheckoutDetails).where(CheckoutDetails.user_id == current_user.id))
     details = result.scalars().first()
     if details:
@@ -202,28 +239,30 @@ async def get_user_shipping_address(
     return {}
 
 
-@router.get("/orders", response_model=List[Order])
+# Rows come straight from the DB, so the schema is declared via `responses=`
+# (OpenAPI only) instead of `response_model=`, which re-validates every row.
+@router.get(
+    "/orders", response_model=None, responses={200: {"model": List[Order]}},
+    dependencies=[Depends(cache_control(NO_STORE))],
+)
 async def get_orders(
-    response: Response,
     current_user: User = Depends(get_db_user),
     session: AsyncSession = Depends(get_session)
 ):
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
     result = await session.execute(
         select(Order).where(Order.user_id == current_user.id).order_by(Order.created_at.desc())
     )
     return result.scalars().all()
 
 
-@router.get("/orders/{id}", response_model=Order)
+@router.get("/orders/{id}", response_model=None, responses={200: {"model": Order}})
 async def get_order(
     id: str,
     current_user: User = Depends(get_db_user),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Order).where(Order.id == id, Order.user_id == current_user.id))
-    order = result.scalars().first()
-    if not order:
+    order = await session.get(Order, id)
+    if not order or order.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Order not found")
     return order
 
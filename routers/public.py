@@ -1,63 +1,93 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import nulls_last, desc, func
+from sqlalchemy import nulls_last, desc, func, or_, and_, exists, tuple_
 from typing import List, Optional
 from datetime import datetime, timezone
+import base64
+import binascii
 
 from db import get_session
 from models import Product, Listing, Category, SubCategory, Brand, HeroContent, GlobalNotice
-from cache import cache
+from cache import cached_json_response, cache_control
 
 router = APIRouter()
 
 
 @router.get("/hero")
-async def get_active_hero(session: AsyncSession = Depends(get_session)):
-    now_str = datetime.now(timezone.utc).isoformat()
-    result = await session.execute(
-        select(HeroContent).where(HeroContent.is_active == True).order_by(HeroContent.priority)
-    )
-    all_heroes = result.scalars().all()
-
-    valid_hero = None
-    for hero in all_heroes:
-        start_valid = not hero.start_date or hero.start_date <= now_str
-        end_valid = not hero.end_date or hero.end_date >= now_str
-        if start_valid and end_valid:
-            valid_hero = hero
-            break
-
-    if valid_hero and valid_hero.type != 'newest':
-        return valid_hero
-
-    result = await session.execute(
-        select(Listing).order_by(nulls_last(desc(Listing.created_at))).limit(5)
-    )
-    newest_listings = result.scalars().all()
-    return {"type": "newest", "listings": newest_listings}
+async def get_active_hero(request: Request, session: AsyncSession = Depends(get_session)):
+    async def load():
+        now_str = datetime.now(timezone.utc).isoformat()
+        # Dates are ISO strings; an empty or missing bound means "open-ended"
+        result = await session.execute(
+            select(HeroContent)
+            .where(
+                HeroContent.is_active == True,
+                or_(HeroContent.start_date.is_(None), HeroContent.start_date == "", HeroContent.start_date <= now_str),
+                or_(HeroContent.end_date.is_(None), HeroContent.end_date == "", HeroContent.end_date >= now_str),
+            )
+            .order_by(HeroContent.priority)
+            .limit(1)
+        )
+        valid_hero = result.scalars().first()
+
+        if valid_hero and valid_hero.type != 'newest':
+            return valid_hero
+
+        result = await session.execute(
+            select(Listing).order_by(nulls_last(desc(Listing.created_at))).limit(5)
+        )
+        newest_listings = result.scalars().all()
+        return {"type": "newest", "listings": newest_listings}
+
+    # Short TTL so scheduled start/end dates take effect within a minute
+    return await cached_json_response(request, "hero:active", load, max_age=None, ttl=60)
 
 
 @router.get("/products", response_model=List[Product])
-async def list_products(response: Response, session: AsyncSession = Depends(get_session)):
-    response.headers["Cache-Control"] = "public, max-age=300"
-    result = await session.execute(select(Product))
-    return result.scalars().all()
+async def list_products(request: Request, session: AsyncSession = Depends(get_session)):
+    async def load():
+        result = await session.execute(select(Product))
+        return result.scalars().all()
 
+    return await cached_json_response(request, "products", load)
 
-@router.get("/listings")
+
+# What a listing card needs; summary pages skip the description, variant
+# JSON and gallery, which are only rendered on the listing detail page
+_LISTING_CARD_COLUMNS = (
+    Listing.id, Listing.category_id, Listing.subcategory_id, Listing.brand_id,
+    Listing.name, Listing.MRP, Listing.supplier_price, Listing.our_cut,
+    Listing.stock_status, Listing.image_url, Listing.created_at,
+)
+
+
+# Opaque keyset cursor naming one (created_at, id) row; /admin/orders shares it
+def encode_cursor(created_at: Optional[str], id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at or ''}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[str], str]:
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at or None, id
+
+
+@router.get("/listings", dependencies=[Depends(cache_control("public, max-age=300"))])
 async def list_listings(
-    response: Response,
     session: AsyncSession = Depends(get_session),
     category_id: Optional[str] = Query(None),
     subCategory_id: Optional[str] = Query(None),
     brand_id: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    limit: int = Query(100, le=200),
-    skip: int = Query(0, ge=0)
+    limit: int = Query(100, ge=1, le=200),
+    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces skip"),
+    summary: bool = Query(False, description="Card fields only: omit description, variants and image_urls")
 ):
-    response.headers["Cache-Control"] = "public, max-age=300"
-    base = select(Listing)
+    base = select(*_LISTING_CARD_COLUMNS) if summary else select(Listing)
     if category_id:
         base = base.where(Listing.category_id == category_id)
     if subCategory_id:
@@ -65,86 +95,119 @@ async def list_listings(
     if brand_id:
         base = base.where(Listing.brand_id == brand_id)
     if search:
-        base = base.where(Listing.name.ilike(f"%{search}%"))
-
-    # Count total matching rows
-    count_result = await session.execute(select(func.count()).select_from(base.subquery()))
-    total = count_result.scalar()
-
-    # Fetch paginated data
-    data_stmt = base.order_by(nulls_last(desc(Listing.created_at))).offset(skip).limit(limit)
-    result = await session.execute(data_stmt)
-    return {"data": result.scalars().all(), "total": total}
-
-
-@router.get("/listings/{id}", response_model=Listing)
+        # ILIKE '%' || :search || '%' with % and _ in the input escaped, so a
+        # user's wildcard can't turn the search into a match-everything scan.
+        # Served by the ix_listing_name_trgm GIN index (migrate_indexes.py).
+        base = base.where(Listing.name.icontains(search, autoescape=True))
+
+    # id breaks created_at ties so pages are stable and a cursor names one row
+    order = (nulls_last(desc(Listing.created_at)), desc(Listing.id))
+
+    if cursor:
+        # Keyset pagination: seek past the last row seen instead of counting
+        # `skip` rows off the front, so deep pages cost the same as the first.
+        # Rows with no created_at sort last and are paged by id alone.
+        last_created, last_id = decode_cursor(cursor)
+        if last_created is None:
+            after = and_(Listing.created_at.is_(None), Listing.id < last_id)
+        else:
+            after = or_(
+                tuple_(Listing.created_at, Listing.id) < tuple_(last_created, last_id),
+                Listing.created_at.is_(None),
+            )
+        rows = (await session.execute(base.where(after).order_by(*order).limit(limit))).all()
+        body = {}
+    else:
+        # Page and total in one round trip: count(*) OVER () is evaluated before
+        # OFFSET/LIMIT, so every row carries the full match count
+        data_stmt = (
+            base.add_columns(func.count().over().label("total"))
+            .order_by(*order)
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = (await session.execute(data_stmt)).all()
+        if rows:
+            total = rows[0].total
+        elif skip:
+            # Paged past the end: no row to read the total from
+            total = (await session.execute(select(func.count()).select_from(base.subquery()))).scalar()
+        else:
+            total = 0
+        body = {"total": total}
+
+    if summary:
+        data = [{k: v for k, v in row._asdict().items() if k != "total"} for row in rows]
+    else:
+        data = [row.Listing for row in rows]
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1] if summary else rows[-1].Listing
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return {"data": data, **body, "next_cursor": next_cursor}
+
+
+@router.get("/listings/{id}", response_model=None, responses={200: {"model": Listing}})
 async def get_listing(id: str, session: AsyncSession = Depends(get_session)):
-    result = await session.execute(select(Listing).where(Listing.id == id))
-    listing = result.scalars().first()
+    listing = await session.get(Listing, id)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
     return listing
 
 
 @router.get("/categories", response_model=list[Category])
-async def list_categories(response: Response, session: AsyncSession = Depends(get_session)):
-    response.headers["Cache-Control"] = "public, max-age=300"
-    cached = cache.get("categories")
-    if cached is not None:
-        return cached
-    result = await session.execute(select(Category))
-    data = result.scalars().all()
-    cache.set("categories", data)
-    return data
+async def list_categories(request: Request, session: AsyncSession = Depends(get_session)):
+    async def load():
+        result = await session.execute(select(Category))
+        return result.scalars().all()
+
+    return await cached_json_response(request, "categories", load, ttl=600)
 
 
 @router.get("/subCategories", response_model=list[SubCategory])
 async def list_sub_categories(
-    response: Response,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     category_id: Optional[str] = Query(None),
 ):
-    response.headers["Cache-Control"] = "public, max-age=300"
-    cache_key = f"subcategories:{category_id or 'all'}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
-    stmt = select(SubCategory)
-    if category_id:
-        stmt = stmt.where(SubCategory.category_id == category_id)
-    result = await session.execute(stmt)
-    data = result.scalars().all()
-    cache.set(cache_key, data)
-    return data
+    async def load():
+        stmt = select(SubCategory)
+        if category_id:
+            stmt = stmt.where(SubCategory.category_id == category_id)
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    return await cached_json_response(request, f"subcategories:{category_id or 'all'}", load, ttl=600)
 
 
 @router.get("/brands", response_model=List[Brand])
 async def list_brands(
-    response: Response,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     subCategory_id: Optional[str] = Query(None)
 ):
-    response.headers["Cache-Control"] = "public, max-age=300"
-    cache_key = f"brands:{subCategory_id or 'all'}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
-    stmt = select(Brand)
-    if subCategory_id:
-        stmt = stmt.join(Listing, Brand.id == Listing.brand_id).where(
-            Listing.subcategory_id == subCategory_id
-        ).distinct()
-    result = await session.execute(stmt)
-    data = result.scalars().all()
-    cache.set(cache_key, data)
-    return data
+    async def load():
+        stmt = select(Brand)
+        if subCategory_id:
+            # Semi-join: brands with at least one listing in the subcategory,
+            # without de-duplicating a row per listing
+            stmt = stmt.where(exists().where(
+                Listing.brand_id == Brand.id,
+                Listing.subcategory_id == subCategory_id,
+            ))
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    return await cached_json_response(request, f"brands:{subCategory_id or 'all'}", load)
+
+
+_ACTIVE_NOTICE = select(GlobalNotice).where(GlobalNotice.is_active == True).limit(1)
 
 
 @router.get("/notice")
-async def get_active_notice(response: Response, session: AsyncSession = Depends(get_session)):
-    response.headers["Cache-Control"] = "public, max-age=60"
-    result = await session.execute(select(GlobalNotice).where(GlobalNotice.is_active == True).limit(1))
-    notice = result.scalars().first()
-    if not notice:
-        return None
-    return notice
+async def get_active_notice(request: Request, session: AsyncSession = Depends(get_session)):
+    async def load():
+        result = await session.execute(_ACTIVE_NOTICE)
+        return result.scalars().first()
+
+    return await cached_json_response(request, "notice:active", load, max_age=60, ttl=60)
@@ -3,12 +3,20 @@ from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from db import get_session
+from db import get_session, update_row, delete_row
 from models import User, RedeemCode
 from auth import get_db_user, admin_only
+from cache import TTLCache
 
 router = APIRouter()
 
+# Code -> RedeemCode for the validate endpoint, which the cart hits on every
+# attempt. Advisory only: create_order re-checks the code when it redeems it.
+redeem_cache = TTLCache(ttl_seconds=30, maxsize=1000)
+
+# Columns an admin may change on an existing code
+_REDEEM_UPDATABLE = frozenset(RedeemCode.model_fields) - {"id", "created_at"}
+
 
 class RedeemCodeValidation(BaseModel):
     code: str
@@ -20,10 +28,13 @@ async def validate_redeem_code(
     current_user: User = Depends(get_db_user),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(
-        select(RedeemCode).where(RedeemCode.code == body.code.strip().upper())
-    )
-    redeem = result.scalars().first()
+    code = body.code.strip().upper()
+    redeem = redeem_cache.get(code)
+    if redeem is None:
+        result = await session.execute(select(RedeemCode).where(RedeemCode.code == code))
+        redeem = result.scalars().first()
+        if redeem:
+            redeem_cache.set(code, redeem)
     if not redeem or not redeem.is_active:
         raise HTTPException(status_code=400, detail="Invalid redeem code")
     if redeem.times_redeemed >= redeem.max_redeems:
@@ -57,7 +68,7 @@ async def admin_create_redeem_code(
         raise HTTPException(status_code=400, detail="A code with this name already exists")
     session.add(code_data)
     await session.commit()
-    await session.refresh(code_data)
+    redeem_cache.clear()
     return code_data
 
 
@@ -68,18 +79,15 @@ async def admin_update_redeem_code(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(RedeemCode).where(RedeemCode.id == id))
-    redeem = result.scalars().first()
+    patch = {key: value for key, value in update_data.items() if key in _REDEEM_UPDATABLE}
+    if "code" in patch:
+        patch["code"] = patch["code"].strip().upper()
+    redeem = await update_row(session, RedeemCode, id, patch)
     if not redeem:
         raise HTTPException(status_code=404, detail="Redeem code not found")
-    for key, value in update_data.items():
-        if hasattr(redeem, key) and key != "id":
-            if key == "code":
-                value = value.strip().upper()
-            setattr(redeem, key, value)
-    session.add(redeem)
     await session.commit()
-    await session.refresh(redeem)
+    # The code string itself may have changed, so drop every entry
+    redeem_cache.clear()
     return redeem
 
 
@@ -89,10 +97,9 @@ async def admin_delete_redeem_code(
     current_user: User = Depends(admin_only),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(RedeemCode).where(RedeemCode.id == id))
-    redeem = result.scalars().first()
+    redeem = await delete_row(session, RedeemCode, id)
     if not redeem:
         raise HTTPException(status_code=404, detail="Redeem code not found")
-    await session.delete(redeem)
     await session.commit()
+    redeem_cache.invalidate(redeem.code)
     return {"message": "Redeem code deleted successfully"}
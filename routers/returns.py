@@ -1,9 +1,10 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
 from pydantic import BaseModel
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from db import get_session
 from models import User, Order, OrderStatus, ReturnRequest, ReturnStatus
@@ -12,6 +13,8 @@ from helpers.email_service import send_email_to_admin, send_return_status_email
 
 router = APIRouter()
 
+RETURN_WINDOW_DAYS = 7
+
 
 class ReturnRequestData(BaseModel):
     reason: str
@@ -21,58 +24,71 @@ class ReturnRequestData(BaseModel):
 async def initiate_return(
     id: str,
     body: ReturnRequestData,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_db_user),
     session: AsyncSession = Depends(get_session)
 ):
-    result = await session.execute(select(Order).where(Order.id == id, Order.user_id == current_user.id))
-    order = result.scalars().first()
-    if not order:
+    # created_at is a UTC ISO-8601 string, so the window check is a string
+    # comparison Postgres evaluates in the same query. The extra day keeps the
+    # whole-days semantics of the old `(now - created_at).days > 7` check.
+    # Any existing return for the order comes back on the same row.
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=RETURN_WINDOW_DAYS + 1)).isoformat()
+    result = await session.execute(
+        select(Order, (Order.created_at > cutoff).label("in_window"), ReturnRequest.id.label("existing_return_id"))
+        .join(ReturnRequest, ReturnRequest.order_id == Order.id, isouter=True)
+        .where(Order.id == id, Order.user_id == current_user.id)
+    )
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Order not found")
+    order = row.Order
 
     if order.status != OrderStatus.DELIVERED:
         raise HTTPException(status_code=400, detail="Only delivered orders can be returned")
 
-    order_date = datetime.fromisoformat(order.created_at).replace(tzinfo=timezone.utc)
-    days_since = (datetime.now(timezone.utc) - order_date).days
-    if days_since > 7:
-        raise HTTPException(status_code=400, detail="Return window has expired (7 days from order date)")
+    if not row.in_window:
+        raise HTTPException(status_code=400, detail=f"Return window has expired ({RETURN_WINDOW_DAYS} days from order date)")
 
-    existing = await session.execute(select(ReturnRequest).where(ReturnRequest.order_id == id))
-    if existing.scalars().first():
+    if row.existing_return_id is not None:
         raise HTTPException(status_code=400, detail="A return request for this order already exists")
 
     return_req = ReturnRequest(order_id=id, user_id=current_user.id, reason=body.reason)
     session.add(return_req)
-    order.status = OrderStatus.RETURN_REQUESTED
-    session.add(order)
+
+    # Guarded transition: of two concurrent requests that both passed the
+    # checks above, only one still finds the order DELIVERED here.
+    claimed = await session.execute(
+        update(Order)
+        .where(Order.id == id, Order.status == OrderStatus.DELIVERED.value)
+        .values(status=OrderStatus.RETURN_REQUESTED.value)
+        .returning(Order.id)
+    )
+    if claimed.first() is None:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail="A return request for this order already exists")
 
     try:
         await session.commit()
-        await session.refresh(return_req)
     except Exception as e:
         await session.rollback()
         logging.error(f"Error saving return request: {e}")
         raise HTTPException(status_code=500, detail="Could not save return request")
 
-    try:
-        await send_email_to_admin(
-            "return_request",
-            f"Return Request for Order {id}",
-            f"Customer {current_user.name or current_user.email} has requested a return for order {id}.\nReason: {body.reason}"
-        )
-    except Exception as e:
-        logging.error(f"Failed to send return request admin email: {e}")
-
-    try:
-        await send_return_status_email(
-            user_email=current_user.email,
-            user_name=current_user.name or "Customer",
-            order_id=str(order.id),
-            return_status="return_requested",
-            amount=order.total_amount,
-            items=order.items
-        )
-    except Exception as e:
-        logging.error(f"Failed to send return confirmation email: {e}")
+    # Emails go out after the response is sent; the senders log their own failures
+    background_tasks.add_task(
+        send_email_to_admin,
+        "return_request",
+        f"Return Request for Order {id}",
+        f"Customer {current_user.name or current_user.email} has requested a return for order {id}.\nReason: {body.reason}"
+    )
+    background_tasks.add_task(
+        send_return_status_email,
+        user_email=current_user.email,
+        user_name=current_user.name or "Customer",
+        order_id=str(order.id),
+        return_status="return_requested",
+        amount=order.total_amount,
+        items=order.items
+    )
 
     return {"message": "Return request submitted successfully", "return_request_id": return_req.id}
@@ -1,5 +1,6 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+from email.utils import parseaddr
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi import Request as FastAPIRequest
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,6 +23,7 @@ class SupportTicketData(BaseModel):
 @router.post("/support/ticket")
 async def create_support_ticket(
     ticket_data: SupportTicketData,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
 ):
     ticket = SupportTicket(
@@ -33,30 +35,25 @@ async def create_support_ticket(
     session.add(ticket)
     try:
         await session.commit()
-        await session.refresh(ticket)
     except Exception as e:
         await session.rollback()
         logging.error(f"Error saving support ticket: {e}")
         raise HTTPException(status_code=500, detail="Could not save support ticket")
 
-    try:
-        await send_support_acknowledgement_email(
-            user_email=ticket.user_email,
-            user_name=ticket.user_name,
-            subject=ticket.subject,
-            ticket_id=ticket.id
-        )
-    except Exception as e:
-        logging.error(f"Failed to send support acknowledgement email: {e}")
-
-    try:
-        await send_email_to_admin(
-            "support_ticket",
-            ticket.subject,
-            f"From: {ticket.user_name} ({ticket.user_email})\n\n{ticket.message}"
-        )
-    except Exception as e:
-        logging.error(f"Failed to send support ticket admin notification: {e}")
+    # Emails go out after the response is sent; the senders log their own failures
+    background_tasks.add_task(
+        send_support_acknowledgement_email,
+        user_email=ticket.user_email,
+        user_name=ticket.user_name,
+        subject=ticket.subject,
+        ticket_id=ticket.id
+    )
+    background_tasks.add_task(
+        send_email_to_admin,
+        "support_ticket",
+        ticket.subject,
+        f"From: {ticket.user_name} ({ticket.user_email})\n\n{ticket.message}"
+    )
 
     return {"message": "Support ticket submitted successfully", "ticket_id": ticket.id}
 
@@ -64,6 +61,7 @@ async def create_support_ticket(
 @router.post("/webhooks/resend")
 async def resend_webhook(
     request: FastAPIRequest,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
 ):
     try:
@@ -78,8 +76,10 @@ async def resend_webhook(
         from_email = data.get("from", "unknown@unknown.com")
         subject = data.get("subject", "No Subject")
         body = data.get("text", data.get("html", ""))
-        sender_name = from_email.split("<")[0].strip() if "<" in from_email else from_email.split("@")[0]
-        sender_email = from_email.split("<")[1].rstrip(">") if "<" in from_email else from_email
+        # RFC 5322 parse: handles quoted display names and bare addresses
+        sender_name, sender_email = parseaddr(from_email)
+        sender_email = sender_email or from_email
+        sender_name = sender_name or sender_email.split("@")[0]
 
         ticket = SupportTicket(
             user_email=sender_email,
@@ -90,20 +90,17 @@ async def resend_webhook(
         session.add(ticket)
         try:
             await session.commit()
-            await session.refresh(ticket)
             logging.info(f"Inbound email ticket created: {ticket.id} from {sender_email}")
         except Exception as e:
             await session.rollback()
             logging.error(f"Error saving inbound email ticket: {e}")
             raise HTTPException(status_code=500, detail="Failed to process inbound email")
 
-        try:
-            await send_email_to_admin(
-                "support_ticket",
-                subject,
-                f"Inbound email from: {sender_name} ({sender_email})\n\n{body[:1000]}"
-            )
-        except Exception as e:
-            logging.error(f"Failed to notify admins of inbound email: {e}")
+        background_tasks.add_task(
+            send_email_to_admin,
+            "support_ticket",
+            subject,
+            f"Inbound email from: {sender_name} ({sender_email})\n\n{body[:1000]}"
+        )
 
     return {"status": "ok"}
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
 
 from db import get_session
 from models import User, Request, ShoppingCart
 from auth import get_db_user
+from cache import cache_control, NO_STORE
 
 router = APIRouter()
 
@@ -23,17 +25,17 @@ async def create_request(
     request_data.user_id = current_user.id
     session.add(request_data)
     await session.commit()
-    await session.refresh(request_data)
     return request_data
 
 
-@router.get("/cart", response_model=ShoppingCart)
+@router.get(
+    "/cart", response_model=None, responses={200: {"model": ShoppingCart}},
+    dependencies=[Depends(cache_control(NO_STORE))],
+)
 async def get_user_cart(
-    response: Response,
     current_user: User = Depends(get_db_user),
     session: AsyncSession = Depends(get_session)
 ):
-    response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
     result = await session.execute(select(ShoppingCart).where(ShoppingCart.user_id == current_user.id))
     cart = result.scalars().first()
     if not cart:
@@ -50,16 +52,12 @@ async def update_user_cart(
     if str(cart_update.user_id) != str(current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to update this cart")
 
-    result = await session.execute(select(ShoppingCart).where(ShoppingCart.user_id == current_user.id))
-    db_cart = result.scalars().first()
-
-    if db_cart:
-        db_cart.items = cart_update.items
-        session.add(db_cart)
-    else:
-        db_cart = ShoppingCart(user_id=current_user.id, items=cart_update.items)
-        session.add(db_cart)
-
+    # Single upsert keyed on the user_id primary key: no read first, and two
+    # concurrent first writes can't collide on a duplicate insert
+    await session.execute(
+        insert(ShoppingCart)
+        .values(user_id=current_user.id, items=cart_update.items)
+        .on_conflict_do_update(index_elements=[ShoppingCart.user_id], set_={"items": cart_update.items})
+    )
     await session.commit()
-    await session.refresh(db_cart)
-    return db_cart
+    return ShoppingCart(user_id=current_user.id, items=cart_update.items)